@@ -25,11 +25,8 @@ async def detect_emotion_from_voice(
                 detail="File must be an audio file"
             )
         
-        # Read audio file
-        audio_data = await audio_file.read()
-        
-        # Detect emotion
-        emotion_result = await emotion_service.detect_emotion_from_audio(audio_data)
+        # Detect emotion straight from the spooled upload, no full in-memory copy
+        emotion_result = await emotion_service.detect_emotion_from_audio(audio_file.file)
         
         # Store detection in database
         detection = EmotionDetection(
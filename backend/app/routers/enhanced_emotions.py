@@ -31,16 +31,15 @@ async def detect_emotion_from_voice(
                 detail="File must be an audio file (WebM, WAV, MP3, etc.)"
             )
         
-        # Read audio data
-        audio_data = await audio_file.read()
-        logger.info(f"📁 Audio file size: {len(audio_data)} bytes, type: {audio_file.content_type}")
+        # The spooled upload is handed to the service as-is instead of being read into memory
+        logger.info(f"📁 Audio file size: {audio_file.size} bytes, type: {audio_file.content_type}")
         
-        if len(audio_data) == 0:
+        if not audio_file.size:
             raise HTTPException(status_code=400, detail="Audio file is empty")
         
         # Process with enhanced emotion detection
         result = await enhanced_emotion_service.detect_emotion_from_voice(
-            audio_data, 
+            audio_file.file, 
             audio_file.filename or "audio.webm",
             user_id
         )
@@ -53,7 +52,7 @@ async def detect_emotion_from_voice(
             "method": result.method,
             "transcription": result.transcription,
             "metadata": {
-                "file_size": len(audio_data),
+                "file_size": audio_file.size,
                 "content_type": audio_file.content_type,
                 "filename": audio_file.filename,
                 "user_id": user_id
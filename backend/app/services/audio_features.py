@@ -0,0 +1,112 @@
+"""
+Audio decoding, preprocessing and feature extraction shared by the voice services.
+Kept free of torch/transformers so pool workers only import what they run.
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, Union, BinaryIO
+import ffmpeg
+import librosa
+import numpy as np
+import scipy.fft
+
+logger = logging.getLogger(__name__)
+
+def ffmpeg_decode(audio_data: Union[bytes, BinaryIO], suffix: str = "", sample_rate: int = 16000) -> np.ndarray:
+    """Decode any ffmpeg-readable input to mono float32 at sample_rate in a single pass; raises ffmpeg.Error"""
+    # Input goes through a temp file (containers like m4a need a seekable source);
+    # file objects are streamed to disk without a full in-memory copy
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as input_file:
+        if isinstance(audio_data, bytes):
+            input_file.write(audio_data)
+        else:
+            shutil.copyfileobj(audio_data, input_file)
+        input_path = input_file.name
+    
+    try:
+        # Raw float32 on stdout: no intermediate WAV to encode, write, read back and decode again
+        out, _ = (
+            ffmpeg
+            .input(input_path)
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ar=sample_rate, ac=1)
+            .run(capture_stdout=True, quiet=True)
+        )
+    finally:
+        os.unlink(input_path)
+    return np.frombuffer(out, np.float32)
+
+# Clips below either threshold are treated as silence and never sent to Whisper
+MIN_SPEECH_SECONDS = 0.3
+MIN_SPEECH_RMS = 1e-3
+
+def preprocess_audio_file(file_path: str) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Decode, normalize and trim audio for analysis.
+    Returns an empty array when there is no speech, and None when decoding failed.
+    """
+    try:
+        # Load audio with librosa
+        audio, sr = librosa.load(file_path, sr=16000, mono=True, res_type='soxr_mq')
+        
+        # Measure loudness before normalization boosts the noise floor
+        rms = float(np.sqrt(np.mean(audio**2))) if len(audio) else 0.0
+        
+        # Normalize audio
+        audio = librosa.util.normalize(audio)
+        
+        # Remove silence
+        audio, _ = librosa.effects.trim(audio, top_db=20)
+        
+        if rms < MIN_SPEECH_RMS or len(audio) / sr < MIN_SPEECH_SECONDS:
+            logger.info(f"🔇 Audio is silent or too short ({len(audio) / sr:.2f}s, rms={rms:.4f})")
+            return np.empty(0, dtype=np.float32), sr
+        
+        logger.info(f"🔧 Audio preprocessed: {len(audio)} samples at {sr}Hz")
+        return audio, sr
+        
+    except Exception as e:
+        logger.warning(f"⚠️ Audio preprocessing failed: {e}")
+        return None, 16000
+
+@lru_cache(maxsize=4)
+def _mel_basis(sr: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Mel filterbank, built once per worker for the fixed shapes used here"""
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+def extract_audio_features(audio: np.ndarray, sr: int) -> Dict[str, Any]:
+    """Analyze audio features for additional emotion context"""
+    try:
+        # Extract features from a single STFT shared by MFCC, centroid and onset strength
+        magnitude = np.abs(librosa.stft(audio, n_fft=2048, hop_length=512))
+        log_mel = librosa.power_to_db(_mel_basis(sr, 2048, 128) @ magnitude**2)
+        mfccs = scipy.fft.dct(log_mel, axis=0, type=2, norm='ortho')[:13]
+        spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+        zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)
+        onset_envelope = librosa.onset.onset_strength(S=log_mel, sr=sr)
+        tempo, _ = librosa.beat.beat_track(onset_envelope=onset_envelope, sr=sr)
+        
+        # Calculate statistics
+        features = {
+            "mfcc_mean": float(np.mean(mfccs)),
+            "mfcc_std": float(np.std(mfccs)),
+            "spectral_centroid_mean": float(np.mean(spectral_centroids)),
+            "zero_crossing_rate_mean": float(np.mean(zero_crossing_rate)),
+            "tempo": float(tempo),
+            "duration": len(audio) / sr,
+            "energy": float(np.mean(audio**2))
+        }
+        
+        logger.info(f"🎵 Audio features extracted: tempo={features['tempo']:.1f}, energy={features['energy']:.3f}")
+        return features
+        
+    except Exception as e:
+        logger.error(f"❌ Audio feature extraction failed: {e}")
+        return {
+            "error": str(e),
+            "duration": 0,
+            "energy": 0
+        }
@@ -3,10 +3,33 @@ import torchaudio
 import librosa
 import numpy as np
 from transformers import Wav2Vec2ForSequenceClassification, Wav2Vec2Processor
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Union, BinaryIO
 import io
 import soundfile as sf
 from app.core.config import settings
+from app.services.audio_features import ffmpeg_decode
+
+TARGET_SAMPLE_RATE = 16000
+
+def _decode_audio(audio_file: Union[bytes, BinaryIO]) -> Tuple[np.ndarray, int]:
+    """Decode to 16 kHz mono float32: soundfile + one torchaudio resample, ffmpeg for formats libsndfile can't read"""
+    # File objects (e.g. an upload's spooled file) are decoded in place without copying into memory first
+    source = io.BytesIO(audio_file) if isinstance(audio_file, bytes) else audio_file
+    try:
+        audio_data, sample_rate = sf.read(source, dtype="float32")
+    except RuntimeError:
+        # mp3/webm/m4a etc. aren't supported by libsndfile (and librosa won't fall back to
+        # audioread for file objects); ffmpeg decodes, downmixes and resamples them in one pass
+        source.seek(0)
+        return ffmpeg_decode(source, sample_rate=TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE
+    
+    if audio_data.ndim > 1:
+        audio_data = audio_data.mean(axis=1)
+    if sample_rate != TARGET_SAMPLE_RATE:
+        audio_data = torchaudio.functional.resample(
+            torch.from_numpy(np.ascontiguousarray(audio_data, dtype=np.float32)), sample_rate, TARGET_SAMPLE_RATE
+        ).numpy()
+    return audio_data, TARGET_SAMPLE_RATE
 
 class EmotionDetectionService:
     def __init__(self):
@@ -34,17 +57,17 @@ class EmotionDetectionService:
             self.processor = None
             self.model = None
     
-    async def detect_emotion_from_audio(self, audio_file: bytes) -> Dict[str, Any]:
+    async def detect_emotion_from_audio(self, audio_file: Union[bytes, BinaryIO]) -> Dict[str, Any]:
         """
         Detect emotion from audio file
         Args:
-            audio_file: Raw audio bytes
+            audio_file: Raw audio bytes or a readable, seekable file object
         Returns:
             Dict with emotion, confidence, and metadata
         """
         try:
             # Load audio from bytes
-            audio_data, sample_rate = librosa.load(io.BytesIO(audio_file), sr=16000)
+            audio_data, sample_rate = _decode_audio(audio_file)
             
             # Preprocess audio
             audio_features = self._extract_audio_features(audio_data, sample_rate)
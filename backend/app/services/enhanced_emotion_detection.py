@@ -7,17 +7,49 @@ import io
 import json
 import logging
 import re
-import tempfile
-from typing import Dict, Any, Optional, Tuple
+import time
+import wave
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple, Union, BinaryIO
 from pathlib import Path
 
 import openai
 import whisper
-import ffmpeg
+import numpy as np
 from pydantic import BaseModel, Field
 
+from .audio_features import ffmpeg_decode
+
 logger = logging.getLogger(__name__)
 
+# Whisper's native input rate
+SAMPLE_RATE = 16000
+
+# Pipelines slower than this log their per-phase breakdown
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+try:
+    from prometheus_client import Histogram
+    PHASE_SECONDS = Histogram(
+        "voice_emotion_phase_seconds",
+        "Time spent in each phase of the voice emotion pipeline",
+        ["phase"]
+    )
+except ImportError:
+    PHASE_SECONDS = None
+
+@contextmanager
+def _timed_phase(phases: Dict[str, float], name: str):
+    """Record a phase's wall time in ms (accumulating repeats) and export it to Prometheus if available."""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+        phases[name] = phases.get(name, 0.0) + elapsed_ms
+        if PHASE_SECONDS is not None:
+            PHASE_SECONDS.labels(phase=name).observe(elapsed_ms / 1000)
+
 class EmotionResult(BaseModel):
     """Structured emotion detection result."""
     emotion: str = Field(..., description="Detected emotion")
@@ -73,7 +105,7 @@ JSON Response:"""
 
     async def detect_emotion_from_voice(
         self, 
-        audio_file: bytes, 
+        audio_file: Union[bytes, BinaryIO], 
         filename: str,
         user_id: Optional[int] = None
     ) -> EmotionResult:
@@ -81,7 +113,7 @@ JSON Response:"""
         Detect emotion from voice recording with full pipeline.
         
         Args:
-            audio_file: Raw audio file bytes
+            audio_file: Raw audio file bytes or a binary file object positioned at the start
             filename: Original filename with extension
             user_id: Optional user ID for logging
             
@@ -90,20 +122,25 @@ JSON Response:"""
         """
         logger.info(f"🎤 Processing voice emotion detection for user {user_id}")
         
+        phases: Dict[str, float] = {}
         try:
-            # Step 1: Convert audio to WAV if needed
-            wav_data = await self._convert_audio_to_wav(audio_file, filename)
+            # Step 1: Decode audio to a 16 kHz mono waveform
+            with _timed_phase(phases, "decode"):
+                audio = await self._decode_audio_to_array(audio_file, filename)
             
             # Step 2: Transcribe using Whisper
-            transcription = await self._transcribe_audio(wav_data)
+            with _timed_phase(phases, "transcribe"):
+                transcription = await self._transcribe_audio(audio)
             logger.info(f"📝 Transcription: {transcription[:100]}...")
             
             if not transcription.strip():
                 logger.warning("⚠️  Empty transcription, falling back to acoustic analysis")
-                return await self._fallback_acoustic_analysis(wav_data, user_id)
+                with _timed_phase(phases, "acoustic"):
+                    return await self._fallback_acoustic_analysis(audio, user_id)
             
             # Step 3: Analyze emotion using LLM
-            llm_result = await self._analyze_emotion_with_llm(transcription)
+            with _timed_phase(phases, "llm"):
+                llm_result = await self._analyze_emotion_with_llm(transcription)
             
             # Step 4: Validate and parse LLM output
             parsed_result = self._parse_llm_emotion_result(llm_result, transcription)
@@ -111,7 +148,8 @@ JSON Response:"""
             # Step 5: Apply fallback if confidence is low
             if parsed_result.confidence < 0.6:
                 logger.info(f"🔄 Low LLM confidence ({parsed_result.confidence}), applying acoustic fallback")
-                acoustic_result = await self._fallback_acoustic_analysis(wav_data, user_id)
+                with _timed_phase(phases, "acoustic"):
+                    acoustic_result = await self._fallback_acoustic_analysis(audio, user_id)
                 
                 # Combine results with weighted average
                 final_result = self._combine_results(parsed_result, acoustic_result)
@@ -132,69 +170,59 @@ JSON Response:"""
                 transcription="",
                 raw_llm_output=f"Error: {str(e)}"
             )
+        finally:
+            total_ms = sum(phases.values())
+            if total_ms > SLOW_REQUEST_MS:
+                breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in phases.items())
+                logger.info(f"🐢 Slow voice emotion pipeline ({total_ms:.0f}ms): {breakdown}")
 
-    async def _convert_audio_to_wav(self, audio_data: bytes, filename: str) -> bytes:
-        """Convert audio file to WAV format using ffmpeg."""
-        logger.info(f"🔄 Converting audio file: {filename}")
+    async def _decode_audio_to_array(self, audio_data: Union[bytes, BinaryIO], filename: str) -> Optional[np.ndarray]:
+        """Decode any input format to a 16 kHz mono float32 array in a single ffmpeg pass."""
+        logger.info(f"🔄 Decoding audio file: {filename}")
         
-        # Check if already WAV
-        if filename.lower().endswith('.wav'):
-            logger.info("✅ Audio is already in WAV format")
-            return audio_data
+        audio = self._read_clean_wav(audio_data)
+        if audio is not None:
+            logger.info("✅ Input already 16 kHz mono PCM16 WAV, skipped ffmpeg")
+            return audio
         
         try:
-            # Create temporary files
-            with tempfile.NamedTemporaryFile(suffix=Path(filename).suffix, delete=False) as input_file:
-                input_file.write(audio_data)
-                input_path = input_file.name
-            
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as output_file:
-                output_path = output_file.name
-            
-            # Convert using ffmpeg
-            (
-                ffmpeg
-                .input(input_path)
-                .output(output_path, acodec='pcm_s16le', ar=16000, ac=1)
-                .overwrite_output()
-                .run(quiet=True)
-            )
-            
-            # Read converted audio
-            with open(output_path, 'rb') as f:
-                wav_data = f.read()
-            
-            # Cleanup
-            os.unlink(input_path)
-            os.unlink(output_path)
-            
-            logger.info("✅ Audio converted to WAV successfully")
-            return wav_data
+            audio = ffmpeg_decode(audio_data, Path(filename).suffix, SAMPLE_RATE)
+            logger.info("✅ Audio decoded successfully")
+            return audio
             
         except Exception as e:
-            logger.error(f"❌ Audio conversion failed: {e}")
-            # Try to use original audio data
-            return audio_data
+            logger.error(f"❌ Audio decoding failed: {e}")
+            return None
 
-    async def _transcribe_audio(self, wav_data: bytes) -> str:
-        """Transcribe audio using Whisper."""
+    @staticmethod
+    def _read_clean_wav(audio_data: Union[bytes, BinaryIO]) -> Optional[np.ndarray]:
+        """Parse a WAV that is already 16 kHz mono PCM16 directly; None for anything else."""
+        source = io.BytesIO(audio_data) if isinstance(audio_data, bytes) else audio_data
+        try:
+            with wave.open(source, 'rb') as wav:
+                if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+                    return None
+                frames = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError):
+            return None
+        finally:
+            if source is audio_data:
+                audio_data.seek(0)
+        # Same scaling ffmpeg applies for s16 -> f32
+        return np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+
+    async def _transcribe_audio(self, audio: Optional[np.ndarray]) -> str:
+        """Transcribe a 16 kHz float32 waveform using Whisper."""
         if not self.whisper_model:
             raise Exception("Whisper model not loaded")
         
+        if audio is None or audio.size == 0:
+            return ""
+        
         try:
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(wav_data)
-                temp_path = temp_file.name
-            
-            # Transcribe
-            result = self.whisper_model.transcribe(temp_path)
-            transcription = result["text"].strip()
-            
-            # Cleanup
-            os.unlink(temp_path)
-            
-            return transcription
+            # Whisper accepts the waveform directly, skipping its own ffmpeg decode
+            result = self.whisper_model.transcribe(audio)
+            return result["text"].strip()
             
         except Exception as e:
             logger.error(f"❌ Transcription failed: {e}")
@@ -266,7 +294,7 @@ JSON Response:"""
                 raw_llm_output=llm_output
             )
 
-    async def _fallback_acoustic_analysis(self, wav_data: bytes, user_id: Optional[int] = None) -> EmotionResult:
+    async def _fallback_acoustic_analysis(self, audio: Optional[np.ndarray], user_id: Optional[int] = None) -> EmotionResult:
         """Fallback acoustic emotion analysis (placeholder for wav2vec2 implementation)."""
         logger.info(f"🎵 Running acoustic emotion analysis fallback")
         
@@ -341,26 +341,7 @@ class SpotifyEmotionMatcher:
     async def _get_audio_features_batch(self, track_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """Get audio features for multiple tracks efficiently."""
         try:
-            features_dict = {}
-            
-            # Process in batches to avoid API limits
-            batch_size = 10
-            for i in range(0, len(track_ids), batch_size):
-                batch = track_ids[i:i + batch_size]
-                
-                for track_id in batch:
-                    try:
-                        features = await self.spotify_service.get_audio_features(track_id)
-                        if features:
-                            features_dict[track_id] = features
-                    except Exception as e:
-                        logger.warning(f"Error getting features for track {track_id}: {e}")
-                        continue
-                
-                # Small delay between batches
-                await asyncio.sleep(0.1)
-            
-            return features_dict
+            return await self.spotify_service.get_audio_features_batch(track_ids)
             
         except Exception as e:
             logger.error(f"Error getting audio features batch: {e}")
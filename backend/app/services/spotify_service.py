@@ -4,20 +4,29 @@ Handles authentication, data fetching, and caching for Spotify data
 """
 
 import os
+import time
+import uuid
+import functools
 import logging
 import asyncio
-from typing import List, Dict, Optional, Any
+from collections import deque
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
-import json
-import requests
-from dataclasses import dataclass
-import redis
+import orjson
+import httpx
+from dataclasses import dataclass, asdict
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 # from sqlalchemy.orm import Session
 # from app.database import get_db
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Failures we expect from the network/cache; anything else is a bug and should surface
+_UPSTREAM_ERRORS = (httpx.HTTPError, orjson.JSONDecodeError)
+_CACHE_ERRORS = (RedisError, orjson.JSONDecodeError)
+
+@dataclass(slots=True)
 class SpotifyTrack:
     id: str
     name: str
@@ -30,7 +39,7 @@ class SpotifyTrack:
     cover_url: Optional[str]
     audio_features: Optional[Dict[str, Any]] = None
 
-@dataclass
+@dataclass(slots=True)
 class SpotifyArtist:
     id: str
     name: str
@@ -39,7 +48,7 @@ class SpotifyArtist:
     image_url: Optional[str]
     external_urls: Dict[str, str]
 
-@dataclass
+@dataclass(slots=True)
 class SpotifyAlbum:
     id: str
     name: str
@@ -49,7 +58,88 @@ class SpotifyAlbum:
     image_url: Optional[str]
     external_urls: Dict[str, str]
 
+class _RateLimiter:
+    """Sliding-window limiter bounding Spotify calls per second and in flight"""
+
+    def __init__(self, rate: int = 10, per: float = 1.0, concurrency: int = 2):
+        self.rate = rate
+        self.per = per
+        self._calls = deque()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def acquire(self) -> None:
+        """Wait until the sliding window has room for another call"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.per:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                await asyncio.sleep(self.per - (now - self._calls[0]))
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self.acquire()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+def _retry_on(*exceptions, attempts: int = 3, backoff: float = 0.5):
+    """Retry an async call on the given exceptions with exponential backoff"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == attempts:
+                        raise
+                    delay = backoff * 2 ** (attempt - 1)
+                    logger.warning(f"⚠️ {func.__name__} failed ({e!r}), retrying in {delay:.1f}s ({attempt}/{attempts})")
+                    await asyncio.sleep(delay)
+        return wrapper
+    return decorator
+
+def _single_flight(key_func):
+    """Collapse concurrent calls with the same key into one in-flight fetch"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            key = key_func(*args, **kwargs)
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(method(self, *args, **kwargs))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shield so one caller being cancelled doesn't cancel the fetch for the others
+            return await asyncio.shield(task)
+        return wrapper
+    return decorator
+
 class SpotifyService:
+    MAX_RETRIES = 5
+    MAX_BACKOFF = 8.0
+    RATE_LIMIT_BUDGET = 15.0  # most seconds one call may spend sleeping on 429s
+    AUDIO_FEATURES_BATCH_SIZE = 100
+    ETAG_TTL = 7 * 86400  # keep validators well past the 6h payload TTL
+    PREFETCH_LIMITS = (10, 20)
+    PREFETCH_INTERVAL = 5 * 3600 + 50 * 60  # refresh shortly before the 6h browse TTL
+    TOKEN_KEY = 'spotify:access_token'
+    TOKEN_LOCK_KEY = 'spotify:token_lock'
+    # Must outlive a whole refresh: 3 transport attempts x 10 s timeout + backoff + 429 budget
+    TOKEN_LOCK_TTL = 60
+    # Delete the lock only if it still holds our token, so an expired holder can't drop a newer lock
+    RELEASE_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
     def __init__(self):
         self.client_id = os.getenv('SPOTIFY_CLIENT_ID')
         self.client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
@@ -57,9 +147,24 @@ class SpotifyService:
         self.base_url = 'https://api.spotify.com/v1'
         self.token_url = 'https://accounts.spotify.com/api/token'
         
+        # Shared HTTP/2 client so every Spotify call reuses pooled keep-alive connections
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=10.0,
+            headers={'Accept': 'application/json'}
+        )
+        self._limiter = _RateLimiter(rate=10, per=1.0, concurrency=2)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._prefetch_task: Optional[asyncio.Task] = None
+        
         # Redis for caching
         try:
-            self.redis_client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+            self.redis_client = aioredis.from_url(
+                os.getenv('REDIS_URL', 'redis://localhost:6379'),
+                decode_responses=False
+            )
         except Exception as e:
             logger.warning(f"⚠️ Redis connection failed: {e}")
             self.redis_client = None
@@ -78,6 +183,69 @@ class SpotifyService:
         else:
             logger.info("🎵 Spotify service initialized with credentials")
 
+    @_retry_on(httpx.TransportError)
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a rate-limited Spotify request, retrying 429s per Retry-After within a time budget"""
+        backoff = 1.0
+        waited = 0.0
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            async with self._limiter:
+                response = await self.http.request(method, url, **kwargs)
+            
+            if response.status_code != 429 or attempt == self.MAX_RETRIES:
+                return response
+            
+            try:
+                delay = float(response.headers.get('Retry-After', backoff))
+            except ValueError:
+                delay = backoff
+            # Retry-After can be minutes; don't hold the caller's request that long
+            if delay > self.MAX_BACKOFF or waited + delay > self.RATE_LIMIT_BUDGET:
+                logger.warning(f"⏳ Spotify rate limited for {delay:.1f}s, giving up after {waited:.1f}s of retries")
+                return response
+            waited += delay
+            logger.warning(f"⏳ Spotify rate limit hit, retrying in {delay:.1f}s ({attempt}/{self.MAX_RETRIES})")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    async def _get_shared_token(self) -> Optional[str]:
+        """Read the access token shared by all workers from Redis"""
+        if not self.redis_client:
+            return None
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                token, ttl = await pipe.get(self.TOKEN_KEY).ttl(self.TOKEN_KEY).execute()
+        except RedisError as e:
+            logger.warning(f"⚠️ Redis token get error: {e}")
+            return None
+        
+        if not token or ttl <= 0:
+            return None
+        self.access_token = token.decode() if isinstance(token, bytes) else token
+        self.token_expires_at = datetime.now() + timedelta(seconds=ttl)
+        return self.access_token
+
+    async def _acquire_token_lock(self) -> Optional[str]:
+        """Elect a single worker to refresh the token; returns its lock token, or None if another worker holds it"""
+        token = uuid.uuid4().hex
+        if not self.redis_client:
+            return token
+        try:
+            acquired = await self.redis_client.set(self.TOKEN_LOCK_KEY, token, nx=True, ex=self.TOKEN_LOCK_TTL)
+            return token if acquired else None
+        except RedisError as e:
+            logger.warning(f"⚠️ Redis token lock error: {e}")
+            return token
+
+    async def _release_token_lock(self, token: str) -> None:
+        """Release the token refresh lock if it is still ours"""
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.eval(self.RELEASE_LOCK_SCRIPT, 1, self.TOKEN_LOCK_KEY, token)
+        except RedisError as e:
+            logger.warning(f"⚠️ Redis token unlock error: {e}")
+
     async def _get_access_token(self) -> str:
         """Get Spotify access token using client credentials flow"""
         if self.access_token and self.token_expires_at and datetime.now() < self.token_expires_at:
@@ -87,9 +255,30 @@ class SpotifyService:
             logger.warning("⚠️ Spotify credentials not configured")
             return None
         
+        return await self._refresh_access_token()
+
+    @_single_flight(lambda: "access_token")
+    async def _refresh_access_token(self) -> Optional[str]:
+        """Fetch a new token, sharing it with other workers through Redis"""
+        # Another worker may already hold a fresh token
+        token = await self._get_shared_token()
+        if token:
+            return token
+        
+        lock_token = await self._acquire_token_lock()
+        if lock_token is None:
+            # Someone else is refreshing; wait for them to publish the token
+            for _ in range(25):
+                await asyncio.sleep(0.2)
+                token = await self._get_shared_token()
+                if token:
+                    return token
+            logger.warning("⚠️ Timed out waiting for shared Spotify token, refreshing locally")
+        
         try:
             # Client credentials flow
-            auth_response = requests.post(
+            auth_response = await self._request(
+                'POST',
                 self.token_url,
                 data={
                     'grant_type': 'client_credentials',
@@ -100,20 +289,30 @@ class SpotifyService:
             )
             
             if auth_response.status_code == 200:
-                token_data = auth_response.json()
+                token_data = orjson.loads(auth_response.content)
                 self.access_token = token_data['access_token']
                 expires_in = token_data.get('expires_in', 3600)
                 self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
                 
+                if self.redis_client:
+                    try:
+                        await self.redis_client.setex(self.TOKEN_KEY, expires_in - 60, self.access_token)
+                    except RedisError as e:
+                        logger.warning(f"⚠️ Redis token set error: {e}")
+                
                 logger.info("✅ Spotify access token obtained")
                 return self.access_token
             else:
                 logger.error(f"❌ Failed to get Spotify token: {auth_response.status_code}")
                 return None
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error getting Spotify token: {e}")
             return None
+        finally:
+            # Never delete a lock another worker still holds
+            if lock_token is not None:
+                await self._release_token_lock(lock_token)
 
     async def _get_headers(self) -> Dict[str, str]:
         """Get headers with authorization token"""
@@ -130,28 +329,67 @@ class SpotifyService:
         if not self.redis_client:
             return None
         try:
-            cached_data = self.redis_client.get(key)
+            cached_data = await self.redis_client.get(key)
             if cached_data:
-                return json.loads(cached_data)
-        except Exception as e:
+                return orjson.loads(cached_data)
+        except _CACHE_ERRORS as e:
             logger.warning(f"⚠️ Redis cache get error: {e}")
         return None
 
+    async def _cache_mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several keys from Redis cache in a single MGET round-trip"""
+        if not self.redis_client or not keys:
+            return [None] * len(keys)
+        try:
+            values = await self.redis_client.mget(keys)
+            return [orjson.loads(value) if value else None for value in values]
+        except _CACHE_ERRORS as e:
+            logger.warning(f"⚠️ Redis cache mget error: {e}")
+        return [None] * len(keys)
+
     async def _cache_set(self, key: str, data: Any, ttl: int = 3600) -> None:
         """Set data in Redis cache"""
         if not self.redis_client:
             return
         try:
-            self.redis_client.setex(key, ttl, json.dumps(data))
-        except Exception as e:
+            await self.redis_client.setex(key, ttl, orjson.dumps(data, default=str))
+        except RedisError as e:
             logger.warning(f"⚠️ Redis cache set error: {e}")
 
-    async def get_new_releases(self, limit: int = 20) -> List[SpotifyAlbum]:
+    async def _cache_mset(self, pairs: Dict[str, Any], ttl: int = 3600) -> None:
+        """Set several keys in Redis cache through one non-transactional pipeline"""
+        if not self.redis_client or not pairs:
+            return
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in pairs.items():
+                    pipe.setex(key, ttl, orjson.dumps(data, default=str))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"⚠️ Redis cache mset error: {e}")
+
+    async def _conditional_get(self, cache_key: str, path: str, headers: Dict[str, str], params: Dict[str, Any]) -> Tuple[httpx.Response, Optional[Dict[str, Any]]]:
+        """GET revalidating against the last stored ETag; returns the response and the stale entry"""
+        stale = await self._cache_get(f"{cache_key}:etag")
+        if stale and stale.get('etag'):
+            headers = {**headers, 'If-None-Match': stale['etag']}
+        response = await self._request('GET', path, headers=headers, params=params)
+        return response, stale
+
+    async def _cache_set_with_etag(self, cache_key: str, data: Any, response: httpx.Response, ttl: int) -> None:
+        """Cache data and, when Spotify sent an ETag, keep it for later revalidation"""
+        await self._cache_set(cache_key, data, ttl=ttl)
+        etag = response.headers.get('ETag')
+        if etag:
+            await self._cache_set(f"{cache_key}:etag", {'etag': etag, 'data': data}, ttl=self.ETAG_TTL)
+
+    @_single_flight(lambda limit=20, force_refresh=False: f"new_releases:{limit}:{force_refresh}")
+    async def get_new_releases(self, limit: int = 20, force_refresh: bool = False) -> List[SpotifyAlbum]:
         """Get new album releases from Spotify"""
         cache_key = f"spotify:new_releases:{limit}"
         
         # Check cache first
-        cached_data = await self._cache_get(cache_key)
+        cached_data = None if force_refresh else await self._cache_get(cache_key)
         if cached_data:
             logger.info("📦 Using cached new releases")
             return [SpotifyAlbum(**album) for album in cached_data]
@@ -162,14 +400,20 @@ class SpotifyService:
                 logger.warning("⚠️ No Spotify token available")
                 return []
             
-            response = requests.get(
-                f"{self.base_url}/browse/new-releases",
-                headers=headers,
-                params={'limit': limit, 'country': 'US'}
+            response, stale = await self._conditional_get(
+                cache_key,
+                "/browse/new-releases",
+                headers,
+                {'limit': limit, 'country': 'US'}
             )
             
+            if response.status_code == 304 and stale:
+                await self._cache_set(cache_key, stale['data'], ttl=21600)  # 6 hours
+                logger.info("📦 New releases unchanged, revalidated cache")
+                return [SpotifyAlbum(**album) for album in stale['data']]
+            
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 albums = []
                 
                 for item in data['albums']['items']:
@@ -185,7 +429,7 @@ class SpotifyService:
                     albums.append(album)
                 
                 # Cache the results
-                await self._cache_set(cache_key, [album.__dict__ for album in albums], ttl=21600)  # 6 hours
+                await self._cache_set_with_etag(cache_key, [asdict(album) for album in albums], response, ttl=21600)  # 6 hours
                 
                 logger.info(f"✅ Fetched {len(albums)} new releases")
                 return albums
@@ -193,16 +437,17 @@ class SpotifyService:
                 logger.error(f"❌ Failed to fetch new releases: {response.status_code}")
                 return []
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error fetching new releases: {e}")
             return []
 
-    async def get_featured_playlists(self, limit: int = 20) -> List[Dict[str, Any]]:
+    @_single_flight(lambda limit=20, force_refresh=False: f"featured_playlists:{limit}:{force_refresh}")
+    async def get_featured_playlists(self, limit: int = 20, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Get featured playlists from Spotify"""
         cache_key = f"spotify:featured_playlists:{limit}"
         
         # Check cache first
-        cached_data = await self._cache_get(cache_key)
+        cached_data = None if force_refresh else await self._cache_get(cache_key)
         if cached_data:
             logger.info("🎵 Using cached featured playlists")
             return cached_data
@@ -212,14 +457,20 @@ class SpotifyService:
             if not headers:
                 return []
             
-            response = requests.get(
-                f"{self.base_url}/browse/featured-playlists",
-                headers=headers,
-                params={'limit': limit, 'country': 'US'}
+            response, stale = await self._conditional_get(
+                cache_key,
+                "/browse/featured-playlists",
+                headers,
+                {'limit': limit, 'country': 'US'}
             )
             
+            if response.status_code == 304 and stale:
+                await self._cache_set(cache_key, stale['data'], ttl=21600)  # 6 hours
+                logger.info("🎵 Featured playlists unchanged, revalidated cache")
+                return stale['data']
+            
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 playlists = []
                 
                 for item in data['playlists']['items']:
@@ -234,7 +485,7 @@ class SpotifyService:
                     playlists.append(playlist)
                 
                 # Cache the results
-                await self._cache_set(cache_key, playlists, ttl=21600)  # 6 hours
+                await self._cache_set_with_etag(cache_key, playlists, response, ttl=21600)  # 6 hours
                 
                 logger.info(f"✅ Fetched {len(playlists)} featured playlists")
                 return playlists
@@ -242,16 +493,17 @@ class SpotifyService:
                 logger.error(f"❌ Failed to fetch featured playlists: {response.status_code}")
                 return []
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error fetching featured playlists: {e}")
             return []
 
-    async def get_top_tracks(self, limit: int = 20) -> List[SpotifyTrack]:
+    @_single_flight(lambda limit=20, force_refresh=False: f"top_tracks:{limit}:{force_refresh}")
+    async def get_top_tracks(self, limit: int = 20, force_refresh: bool = False) -> List[SpotifyTrack]:
         """Get top tracks from Spotify"""
         cache_key = f"spotify:top_tracks:{limit}"
         
         # Check cache first
-        cached_data = await self._cache_get(cache_key)
+        cached_data = None if force_refresh else await self._cache_get(cache_key)
         if cached_data:
             logger.info("🎶 Using cached top tracks")
             return [SpotifyTrack(**track) for track in cached_data]
@@ -262,8 +514,9 @@ class SpotifyService:
                 return []
             
             # Get top tracks by searching for popular tracks
-            response = requests.get(
-                f"{self.base_url}/search",
+            response = await self._request(
+                'GET',
+                "/search",
                 headers=headers,
                 params={
                     'q': 'year:2024',
@@ -274,7 +527,7 @@ class SpotifyService:
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 tracks = []
                 
                 for item in data['tracks']['items']:
@@ -292,7 +545,7 @@ class SpotifyService:
                     tracks.append(track)
                 
                 # Cache the results
-                await self._cache_set(cache_key, [track.__dict__ for track in tracks], ttl=21600)  # 6 hours
+                await self._cache_set(cache_key, [asdict(track) for track in tracks], ttl=21600)  # 6 hours
                 
                 logger.info(f"✅ Fetched {len(tracks)} top tracks")
                 return tracks
@@ -300,43 +553,85 @@ class SpotifyService:
                 logger.error(f"❌ Failed to fetch top tracks: {response.status_code}")
                 return []
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error fetching top tracks: {e}")
             return []
 
+    @_single_flight(lambda track_id: f"audio_features:{track_id}")
     async def get_audio_features(self, track_id: str) -> Optional[Dict[str, Any]]:
         """Get audio features for a specific track"""
-        cache_key = f"spotify:audio_features:{track_id}"
+        features = await self.get_audio_features_batch([track_id])
+        return features.get(track_id)
+
+    async def get_audio_features_batch(self, track_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get audio features for many tracks, fetching up to 100 IDs per Spotify request"""
+        track_ids = list(dict.fromkeys(track_ids))
+        features = {}
+        missing = []
         
-        # Check cache first
-        cached_data = await self._cache_get(cache_key)
-        if cached_data:
-            return cached_data
+        # Check cache first, one MGET for the whole batch
+        cached = await self._cache_mget([f"spotify:audio_features:{track_id}" for track_id in track_ids])
+        for track_id, cached_data in zip(track_ids, cached):
+            if cached_data:
+                features[track_id] = cached_data
+            else:
+                missing.append(track_id)
+        
+        if not missing:
+            return features
         
         try:
             headers = await self._get_headers()
             if not headers:
-                return None
+                return features
             
-            response = requests.get(
-                f"{self.base_url}/audio-features/{track_id}",
-                headers=headers
-            )
+            chunks = [
+                missing[i:i + self.AUDIO_FEATURES_BATCH_SIZE]
+                for i in range(0, len(missing), self.AUDIO_FEATURES_BATCH_SIZE)
+            ]
+            responses = await asyncio.gather(*[
+                self._request(
+                    'GET',
+                    "/audio-features",
+                    headers=headers,
+                    params={'ids': ','.join(chunk)}
+                )
+                for chunk in chunks
+            ], return_exceptions=True)
             
-            if response.status_code == 200:
-                features = response.json()
+            # A failed chunk only loses its own tracks; the rest are still merged and cached
+            fetched = {}
+            for chunk, response in zip(chunks, responses):
+                if isinstance(response, BaseException):
+                    if not isinstance(response, _UPSTREAM_ERRORS):
+                        raise response
+                    logger.error(f"❌ Error fetching audio features for {len(chunk)} tracks: {response}")
+                    continue
+                if response.status_code != 200:
+                    logger.error(f"❌ Failed to fetch audio features for {len(chunk)} tracks: {response.status_code}")
+                    continue
                 
-                # Cache the results
-                await self._cache_set(cache_key, features, ttl=86400)  # 24 hours
-                
-                return features
-            else:
-                logger.error(f"❌ Failed to fetch audio features for {track_id}: {response.status_code}")
-                return None
+                try:
+                    items = orjson.loads(response.content).get('audio_features') or []
+                except orjson.JSONDecodeError as e:
+                    logger.error(f"❌ Invalid audio features response for {len(chunk)} tracks: {e}")
+                    continue
+                for item in items:
+                    if item:
+                        fetched[item['id']] = item
+            
+            # Cache each track individually so single lookups still hit
+            await self._cache_mset(
+                {f"spotify:audio_features:{track_id}": item for track_id, item in fetched.items()},
+                ttl=86400  # 24 hours
+            )
+            
+            features.update(fetched)
+            return features
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error fetching audio features: {e}")
-            return None
+            return features
 
     async def search_tracks(self, query: str, limit: int = 20) -> List[SpotifyTrack]:
         """Search for tracks"""
@@ -345,8 +640,9 @@ class SpotifyService:
             if not headers:
                 return []
             
-            response = requests.get(
-                f"{self.base_url}/search",
+            response = await self._request(
+                'GET',
+                "/search",
                 headers=headers,
                 params={
                     'q': query,
@@ -357,7 +653,7 @@ class SpotifyService:
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 tracks = []
                 
                 for item in data['tracks']['items']:
@@ -380,9 +676,36 @@ class SpotifyService:
                 logger.error(f"❌ Failed to search tracks: {response.status_code}")
                 return []
                 
-        except Exception as e:
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"❌ Error searching tracks: {e}")
             return []
 
+    def start_prefetch(self) -> None:
+        """Start keeping the popular browse caches warm in the background"""
+        if self._prefetch_task is None and self.client_id and self.client_secret:
+            self._prefetch_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        """Refetch popular browse endpoints before they expire so user requests always hit cache"""
+        while True:
+            try:
+                for limit in self.PREFETCH_LIMITS:
+                    await self.get_new_releases(limit, force_refresh=True)
+                    await self.get_featured_playlists(limit, force_refresh=True)
+                    await self.get_top_tracks(limit, force_refresh=True)
+                logger.info("🔄 Spotify browse caches refreshed")
+            except Exception as e:
+                logger.error(f"❌ Error refreshing Spotify caches: {e}")
+            await asyncio.sleep(self.PREFETCH_INTERVAL)
+
+    async def aclose(self) -> None:
+        """Stop background refresh and close the pooled HTTP client and Redis connections"""
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        await self.http.aclose()
+        if self.redis_client:
+            await self.redis_client.aclose()
+
 # Global instance
 spotify_service = SpotifyService()
@@ -3,24 +3,158 @@ Enhanced Voice Emotion Detection Service
 Uses OpenAI Whisper for speech-to-text and HuggingFace for emotion classification
 """
 
+import io
 import os
+import re
 import logging
-import tempfile
 import asyncio
-from typing import Dict, Any, Optional, Tuple
+import multiprocessing
+import aiofiles
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import openai
 from transformers import pipeline
 import torch
-import librosa
 import soundfile as sf
 import numpy as np
 
+from .audio_features import preprocess_audio_file, extract_audio_features
+
 logger = logging.getLogger(__name__)
 
+# librosa work is CPU-bound; run it in worker processes so concurrent analyses
+# don't serialize on the GIL and block the event loop. Workers are spawned, not forked,
+# so they don't inherit torch's thread pools or CUDA state, and they only import
+# audio_features. The pool is per server worker, so keep AUDIO_POOL_WORKERS small.
+AUDIO_POOL_WORKERS = int(os.getenv('AUDIO_POOL_WORKERS', '2'))
+_audio_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_audio_pool() -> ProcessPoolExecutor:
+    """Create the audio worker pool on first use"""
+    global _audio_pool
+    if _audio_pool is None:
+        _audio_pool = ProcessPoolExecutor(
+            max_workers=AUDIO_POOL_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _audio_pool
+
+def shutdown_audio_pool() -> None:
+    """Stop the audio worker processes, if they were ever started"""
+    global _audio_pool
+    if _audio_pool is not None:
+        _audio_pool.shutdown(wait=False, cancel_futures=True)
+        _audio_pool = None
+
+# Keyword vocabulary for the fallback classifier. Each keyword belongs to one
+# emotion, so "hate" only counts towards angry.
+_FALLBACK_KEYWORDS = {
+    'happy': ['happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'love', 'good'],
+    'sad': ['sad', 'depressed', 'down', 'terrible', 'awful', 'bad', 'cry'],
+    'angry': ['angry', 'mad', 'furious', 'rage', 'hate', 'annoyed', 'frustrated'],
+}
+_FALLBACK_KEYWORD_EMOTIONS = {
+    word: emotion for emotion, words in _FALLBACK_KEYWORDS.items() for word in words
+}
+_FALLBACK_KEYWORD_PATTERN = re.compile(
+    "|".join(re.escape(word) for word in sorted(_FALLBACK_KEYWORD_EMOTIONS, key=len, reverse=True))
+)
+
+# Text emotion model. On CPU hosts an int8 ONNX export can be served instead by
+# pointing EMOTION_MODEL_ONNX_DIR at the output of:
+#   optimum-cli export onnx --model j-hartmann/emotion-english-distilroberta-base --task text-classification ./emo-onnx
+#   optimum-cli onnxruntime quantize --onnx_model ./emo-onnx --avx512_vnni -o ./emo-onnx-int8
+EMOTION_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# Model labels -> our emotion categories
+_EMOTION_MAP = {
+    'joy': 'happy',
+    'sadness': 'sad',
+    'anger': 'angry',
+    'fear': 'fearful',
+    'surprise': 'surprised',
+    'disgust': 'disgusted',
+    'neutral': 'neutral'
+}
+
+# torch's thread pools are process-wide (Whisper and Wav2Vec2 share them) and every server
+# worker has its own, so they are only tuned when TORCH_THREADS is set for the deployment
+if os.getenv('TORCH_THREADS'):
+    torch.set_num_threads(int(os.environ['TORCH_THREADS']))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set once parallel work has started
+
+# Text classifier micro-batching: up to 8 transcriptions or 20 ms, whichever comes first
+CLASSIFIER_MAX_BATCH = 8
+CLASSIFIER_BATCH_WINDOW = 0.02
+
+def _float_to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """Scale [-1, 1] float audio to int16 with one float32 scratch buffer, clipping in place"""
+    scratch = np.multiply(audio, 32767.0, dtype=np.float32)
+    np.clip(scratch, -32768.0, 32767.0, out=scratch)
+    return scratch.astype(np.int16)
+
+class _ClassifierBatcher:
+    """Coalesces concurrent classification requests into a single pipeline call"""
+
+    def __init__(self, classifier, max_batch: int = CLASSIFIER_MAX_BATCH, window: float = CLASSIFIER_BATCH_WINDOW):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def classify(self, text: str) -> List[Dict[str, Any]]:
+        """Queue text for the next batch and wait for its scores"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _infer(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run the classifier without autograd bookkeeping (grad mode is per thread)"""
+        with torch.inference_mode():
+            return self.classifier(texts)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for one request, then collect more until the window closes or the batch is full
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self._infer, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
 class VoiceAnalysisService:
     def __init__(self):
         self.openai_client = None
         self.emotion_classifier = None
+        self._classifier_batcher = None
         self._initialize_services()
     
     def _initialize_services(self):
@@ -29,19 +163,33 @@ class VoiceAnalysisService:
             # Initialize OpenAI client
             openai_api_key = os.getenv('OPENAI_API_KEY')
             if openai_api_key and openai_api_key != 'your_openai_api_key':
-                self.openai_client = openai.OpenAI(api_key=openai_api_key)
+                self.openai_client = openai.AsyncOpenAI(api_key=openai_api_key)
                 logger.info("✅ OpenAI client initialized")
             else:
                 logger.warning("⚠️ OpenAI API key not configured")
             
             # Initialize emotion classifier
             try:
-                self.emotion_classifier = pipeline(
-                    "text-classification",
-                    model="j-hartmann/emotion-english-distilroberta-base",
-                    return_all_scores=True
-                )
-                logger.info("✅ Emotion classifier initialized")
+                use_gpu = torch.cuda.is_available()
+                onnx_dir = os.getenv('EMOTION_MODEL_ONNX_DIR')
+                if onnx_dir and not use_gpu:
+                    self.emotion_classifier = self._load_onnx_classifier(onnx_dir)
+                
+                if self.emotion_classifier is None:
+                    self.emotion_classifier = pipeline(
+                        "text-classification",
+                        model=EMOTION_MODEL_NAME,
+                        top_k=None,
+                        device=0 if use_gpu else -1,
+                        torch_dtype=torch.float16 if use_gpu else None,
+                        batch_size=CLASSIFIER_MAX_BATCH
+                    )
+                    if not use_gpu and os.getenv('QUANTIZE', '1') == '1':
+                        self._quantize_classifier()
+                    if os.getenv('COMPILE', '0') == '1':
+                        self._compile_classifier()
+                self._classifier_batcher = _ClassifierBatcher(self.emotion_classifier)
+                logger.info(f"✅ Emotion classifier initialized on {'GPU (fp16)' if use_gpu else 'CPU'}")
             except Exception as e:
                 logger.warning(f"⚠️ Emotion classifier initialization failed: {e}")
                 self.emotion_classifier = None
@@ -49,6 +197,57 @@ class VoiceAnalysisService:
         except Exception as e:
             logger.error(f"❌ Service initialization error: {e}")
     
+    def _quantize_classifier(self) -> None:
+        """Swap the CPU model's Linear layers for int8 dynamically quantized ones"""
+        try:
+            self.emotion_classifier.model = torch.ao.quantization.quantize_dynamic(
+                self.emotion_classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            logger.info("✅ Emotion classifier quantized to int8")
+        except Exception as e:
+            logger.warning(f"⚠️ Emotion classifier quantization failed, keeping fp32: {e}")
+    
+    def _compile_classifier(self) -> None:
+        """Wrap the PyTorch model in torch.compile to fuse kernels and cut per-op dispatch"""
+        eager_model = self.emotion_classifier.model
+        try:
+            self.emotion_classifier.model = torch.compile(eager_model)
+            # torch.compile is lazy; run one batch now so compile errors surface here, not per request
+            with torch.inference_mode():
+                self.emotion_classifier(["warming up the emotion classifier"])
+            logger.info("✅ Emotion classifier compiled with torch.compile")
+        except Exception as e:
+            self.emotion_classifier.model = eager_model
+            logger.warning(f"⚠️ torch.compile unavailable for emotion classifier, running eager: {e}")
+    
+    def _load_onnx_classifier(self, model_dir: str):
+        """Load the int8-quantized ONNX export of the emotion model; None if unavailable"""
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import AutoTokenizer
+        except ImportError:
+            logger.warning("⚠️ optimum[onnxruntime] not installed, using PyTorch emotion classifier")
+            return None
+        
+        try:
+            model = ORTModelForSequenceClassification.from_pretrained(
+                model_dir,
+                file_name=os.getenv('EMOTION_MODEL_ONNX_FILE', 'model_quantized.onnx')
+            )
+            tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_NAME)
+        except Exception as e:
+            logger.warning(f"⚠️ ONNX emotion model load failed, using PyTorch: {e}")
+            return None
+        
+        logger.info(f"✅ Loaded int8 ONNX emotion model from {model_dir}")
+        return pipeline(
+            "text-classification",
+            model=model,
+            tokenizer=tokenizer,
+            top_k=None,
+            batch_size=CLASSIFIER_MAX_BATCH
+        )
+    
     async def analyze_voice_file(self, file_path: str) -> Dict[str, Any]:
         """
         Analyze voice file for emotion detection
@@ -58,24 +257,30 @@ class VoiceAnalysisService:
         logger.info(f"🎤 [{request_id}] Starting voice analysis for: {file_path}")
         
         try:
-            # Step 1: Preprocess audio
-            processed_audio_path = await self._preprocess_audio(file_path)
+            # Step 1: Preprocess audio, kept in memory for the remaining steps
+            audio, sr = await self._preprocess_audio(file_path)
+            
+            if audio is not None and not len(audio):
+                logger.info(f"🔇 [{request_id}] No speech detected, skipping transcription")
+                return {
+                    "request_id": request_id,
+                    "transcription": "",
+                    "emotion": "neutral",
+                    "confidence": 0.5,
+                    "all_emotions": {"neutral": 0.5},
+                    "audio_features": {"duration": 0, "energy": 0},
+                    "method": "silence_detection",
+                    "success": True
+                }
             
             # Step 2: Speech-to-Text
-            transcription = await self._speech_to_text(processed_audio_path)
+            transcription = await self._speech_to_text(file_path, audio, sr)
             
             # Step 3: Emotion Classification
             emotion_result = await self._classify_emotion(transcription)
             
             # Step 4: Audio features analysis
-            audio_features = await self._analyze_audio_features(processed_audio_path)
-            
-            # Clean up temporary file
-            if processed_audio_path != file_path:
-                try:
-                    os.remove(processed_audio_path)
-                except:
-                    pass
+            audio_features = await self._analyze_audio_features(audio, sr)
             
             result = {
                 "request_id": request_id,
@@ -100,43 +305,32 @@ class VoiceAnalysisService:
                 "method": "enhanced_ai_analysis"
             }
     
-    async def _preprocess_audio(self, file_path: str) -> str:
+    async def _preprocess_audio(self, file_path: str) -> Tuple[Optional[np.ndarray], int]:
         """Preprocess audio file for better analysis"""
-        try:
-            # Load audio with librosa
-            audio, sr = librosa.load(file_path, sr=16000, mono=True)
-            
-            # Normalize audio
-            audio = librosa.util.normalize(audio)
-            
-            # Remove silence
-            audio, _ = librosa.effects.trim(audio, top_db=20)
-            
-            # Create temporary file for processed audio
-            temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            sf.write(temp_file.name, audio, 16000)
-            temp_file.close()
-            
-            logger.info(f"🔧 Audio preprocessed: {len(audio)} samples at {sr}Hz")
-            return temp_file.name
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Audio preprocessing failed: {e}")
-            return file_path
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_audio_pool(), preprocess_audio_file, file_path)
     
-    async def _speech_to_text(self, file_path: str) -> str:
-        """Convert speech to text using OpenAI Whisper"""
+    async def _speech_to_text(self, file_path: str, audio: Optional[np.ndarray], sr: int) -> str:
+        """Convert speech to text using OpenAI Whisper; the original file is sent if preprocessing failed"""
         if not self.openai_client:
             logger.warning("⚠️ OpenAI client not available, using fallback transcription")
             return "Sample transcription for testing"
         
         try:
-            with open(file_path, 'rb') as audio_file:
-                transcript = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
+            if audio is not None:
+                # Encode the processed clip once, in memory
+                buffer = io.BytesIO()
+                sf.write(buffer, _float_to_pcm16(audio), sr, format='WAV', subtype='PCM_16')
+                upload = ("audio.wav", buffer.getvalue())
+            else:
+                async with aiofiles.open(file_path, 'rb') as audio_file:
+                    upload = (os.path.basename(file_path), await audio_file.read())
+            
+            transcript = await self.openai_client.audio.transcriptions.create(
+                model="whisper-1",
+                file=upload,
+                response_format="text"
+            )
             
             logger.info(f"📝 Transcription completed: {len(transcript)} characters")
             return transcript.strip()
@@ -152,29 +346,17 @@ class VoiceAnalysisService:
             return self._fallback_emotion_classification(text)
         
         try:
-            # Get emotion predictions
-            predictions = self.emotion_classifier(text)
+            # Get emotion predictions, batched with any concurrent requests
+            predictions = await self._classifier_batcher.classify(text)
             
-            # Find the emotion with highest score
-            best_emotion = max(predictions[0], key=lambda x: x['score'])
-            
-            # Map to our emotion categories
-            emotion_mapping = {
-                'joy': 'happy',
-                'sadness': 'sad',
-                'anger': 'angry',
-                'fear': 'fearful',
-                'surprise': 'surprised',
-                'disgust': 'disgusted',
-                'neutral': 'neutral'
-            }
-            
-            mapped_emotion = emotion_mapping.get(best_emotion['label'], best_emotion['label'])
+            # With top_k=None the pipeline returns scores sorted descending
+            best_emotion = predictions[0]
+            mapped_emotion = _EMOTION_MAP.get(best_emotion['label'], best_emotion['label'])
             
             result = {
                 "emotion": mapped_emotion,
                 "confidence": best_emotion['score'],
-                "all_emotions": {pred['label']: pred['score'] for pred in predictions[0]}
+                "all_emotions": {pred['label']: pred['score'] for pred in predictions}
             }
             
             logger.info(f"🎭 Emotion classified: {mapped_emotion} ({best_emotion['score']:.3f})")
@@ -193,16 +375,13 @@ class VoiceAnalysisService:
                 "all_emotions": {"neutral": 0.5}
             }
         
-        # Simple keyword-based emotion detection
+        # Simple keyword-based emotion detection, one regex pass over the text
         text_lower = text.lower()
         
-        happy_keywords = ['happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'love', 'good']
-        sad_keywords = ['sad', 'depressed', 'down', 'terrible', 'awful', 'hate', 'bad', 'cry']
-        angry_keywords = ['angry', 'mad', 'furious', 'rage', 'hate', 'annoyed', 'frustrated']
-        
-        happy_score = sum(1 for word in happy_keywords if word in text_lower)
-        sad_score = sum(1 for word in sad_keywords if word in text_lower)
-        angry_score = sum(1 for word in angry_keywords if word in text_lower)
+        scores = Counter(_FALLBACK_KEYWORD_EMOTIONS[word] for word in set(_FALLBACK_KEYWORD_PATTERN.findall(text_lower)))
+        happy_score = scores['happy']
+        sad_score = scores['sad']
+        angry_score = scores['angry']
         
         if happy_score > sad_score and happy_score > angry_score:
             emotion = "happy"
@@ -228,39 +407,16 @@ class VoiceAnalysisService:
             }
         }
     
-    async def _analyze_audio_features(self, file_path: str) -> Dict[str, Any]:
+    async def _analyze_audio_features(self, audio: Optional[np.ndarray], sr: int) -> Dict[str, Any]:
         """Analyze audio features for additional emotion context"""
-        try:
-            # Load audio
-            audio, sr = librosa.load(file_path, sr=16000)
-            
-            # Extract features
-            mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)
-            tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
-            
-            # Calculate statistics
-            features = {
-                "mfcc_mean": float(np.mean(mfccs)),
-                "mfcc_std": float(np.std(mfccs)),
-                "spectral_centroid_mean": float(np.mean(spectral_centroids)),
-                "zero_crossing_rate_mean": float(np.mean(zero_crossing_rate)),
-                "tempo": float(tempo),
-                "duration": len(audio) / sr,
-                "energy": float(np.mean(audio**2))
-            }
-            
-            logger.info(f"🎵 Audio features extracted: tempo={features['tempo']:.1f}, energy={features['energy']:.3f}")
-            return features
-            
-        except Exception as e:
-            logger.error(f"❌ Audio feature extraction failed: {e}")
+        if audio is None:
             return {
-                "error": str(e),
+                "error": "Audio could not be decoded",
                 "duration": 0,
                 "energy": 0
             }
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_audio_pool(), extract_audio_features, audio, sr)
 
 # Global instance
 voice_analysis_service = VoiceAnalysisService()
@@ -0,0 +1,25 @@
+"""
+Gunicorn settings, loaded automatically when gunicorn starts from this directory.
+Sets up prometheus_client multiprocess mode so /metrics aggregates every worker.
+"""
+import os
+import shutil
+import tempfile
+
+# Workers write their metric samples here; must be set before they import prometheus_client
+prometheus_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "aura_prometheus")
+)
+
+def on_starting(server):
+    """Start every run with an empty metrics directory"""
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop an exited worker's live samples from the aggregate"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)